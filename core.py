@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 import os
+from functools import lru_cache
+from typing import Iterator
 from exceptions import UnsupportedFormatError
 
 class DocumentProcessor(ABC):
-    SUPPORT_EXTENSIONS = ['csv', 'xlsx', 'xls']
+    SUPPORT_EXTENSIONS = frozenset({'csv', 'xlsx', 'xls'})
 
     def __init__(self, file_path):
         self.file_path = file_path
@@ -13,6 +15,10 @@ class DocumentProcessor(ABC):
         """提取文档文本"""
         pass
 
+    def iter_text(self) -> Iterator[str]:
+        """逐块产出文档文本（默认一次性产出extract_text的结果，子类可覆盖为流式实现）"""
+        yield self.extract_text()
+
     @abstractmethod
     def extract_metadata(self) -> dict:
         """提取文档元数据"""
@@ -31,18 +37,26 @@ class DocumentProcessorFactory:
         """注册文档处理器"""
         for ext in processor_class.SUPPORT_EXTENSIONS:
             cls._processors[ext] = processor_class
+        # 注册表已变化，清空扩展名解析缓存
+        cls._resolve.cache_clear()
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _resolve(extension: str):
+        """根据原始扩展名（未转小写）查找处理器类，结果按扩展名缓存"""
+        return DocumentProcessorFactory._processors.get(extension.lower())
 
     @classmethod
     def get_processor(cls, file_path: str) -> DocumentProcessor:
         """根据文件路径获取文档处理器"""
-        extension = os.path.splitext(file_path)[1][1:].lower()
+        extension = os.path.splitext(file_path)[1][1:]
 
         if not extension:
             raise UnsupportedFormatError(f"File has no extension: {file_path}")
         
-        processor_class = cls._processors.get(extension)
+        processor_class = cls._resolve(extension)
         
         if not processor_class:
-            raise UnsupportedFormatError(f"Unsupported file format: {extension}")
+            raise UnsupportedFormatError(f"Unsupported file format: {extension.lower()}")
 
         return processor_class(file_path)
\ No newline at end of file
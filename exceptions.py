@@ -12,4 +12,10 @@ class FileCorruptionError(DocumentProcessingError):
 
 class PasswordProtectedError(DocumentProcessingError):
     """密码保护文档异常"""
-    pass
\ No newline at end of file
+    pass
+
+class BatchSubmitError(Exception):
+    """分组申请上传URL或提交任务时部分分组失败；batch_ids为已成功创建的批量任务ID，仍可用于获取结果"""
+    def __init__(self, message: str, batch_ids: list):
+        super().__init__(message)
+        self.batch_ids = batch_ids
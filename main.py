@@ -7,7 +7,7 @@ if __name__ == "__main__":
         print("MinerU处理器初始化成功!")
         
         # 示例：上传本地文件
-        batch_id = processor.upload_files(
+        batch_ids = processor.upload_files(
             file_paths=["data/pdf/test/testpdf01.pdf"],
             is_ocr_list=[True],
             data_ids=["test03"],
@@ -15,7 +15,7 @@ if __name__ == "__main__":
         )
         
         # 获取结果（使用自定义轮询参数）
-        results = processor.get_batch_results(batch_id, max_retries=30, interval=30)
+        results = processor.get_batch_results(batch_ids, max_retries=30, interval=30)
         
         # 处理结果
         for res in results:
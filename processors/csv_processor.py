@@ -1,6 +1,9 @@
 import os
+import io
 import csv
-from typing import List
+import mmap
+from contextlib import contextmanager
+from typing import Iterator, List, TextIO
 from core import DocumentProcessor
 from exceptions import FileCorruptionError
 from utils.file_utils import validate_file_exists
@@ -8,6 +11,17 @@ from utils.file_utils import validate_file_exists
 class CSVProcessor(DocumentProcessor):
     """处理电子表格格式(CSV)的处理器"""
     SUPPORTED_EXTENSIONS = ['csv']
+    # 读取原始字节的缓冲区大小，较大的缓冲区可减少read系统调用次数
+    READ_BUFFER_SIZE = 16 * 1024 * 1024
+    # 不超过该大小的文件一次性读入并整体解码，更大的文件流式解码
+    SLURP_MAX_SIZE = 100 * 1024 * 1024
+    # 特殊字符替换表：单次translate完成全部替换
+    _TRANS = str.maketrans({
+        ';': '；',  # 全角分号
+        '\n': '↵',  # 换行符替换
+        '\r': '',    # 移除回车符
+        '\t': '    ' # 制表符替换为空格
+    })
     
     def __init__(self, file_path: str, unique_key: str, max_len: int):
         super().__init__(file_path)
@@ -19,7 +33,12 @@ class CSVProcessor(DocumentProcessor):
     def extract_text(self) -> str:
         """提取所有工作表的文本内容，用换页符分隔"""
         if self.file_extension == 'csv':
-            return self._extract_csv_text()
+            return '\n'.join(self.iter_text())
+
+    def iter_text(self) -> Iterator[str]:
+        """逐块产出文本内容，内存占用与文件大小无关"""
+        if self.file_extension == 'csv':
+            yield from self._iter_csv_text()
     
     def extract_metadata(self) -> dict:
         """提取电子表格元数据"""
@@ -35,15 +54,14 @@ class CSVProcessor(DocumentProcessor):
             meta['sheet_names'] = ['Sheet1']
             return meta
     
-    def _extract_csv_text(self) -> str:
+    def _iter_csv_text(self) -> Iterator[str]:
         try:
             MAX_LEN = self.max_len
             UNIQUE_KEY = self.unique_key
             # 减少预留空间，增加可用长度
             OVERHEAD_PADDING = 3
-            content: List[str] = []
             
-            with open(self.file_path, 'r', encoding='gbk', errors='ignore') as f:
+            with self._open_csv_text() as f:
                 reader = csv.reader(f)
                 header = next(reader, None)
                 if not header:
@@ -54,93 +72,131 @@ class CSVProcessor(DocumentProcessor):
                     unique_index = header.index(UNIQUE_KEY)
                 except ValueError:
                     unique_index = 0
+
+                # 绑定到局部变量，减少逐值的属性查找
+                sanitize = self._sanitize_value
+                chunk_row = self._chunk_row
+                # 预先计算与行无关的量：列数及各字段头"field: "的长度
+                num_cols = len(header)
+                header_lens = [len(h) + 2 for h in header]
                     
                 for i, row in enumerate(reader):
                     # 确保行长度与表头一致
-                    if len(row) < len(header):
-                        row += [''] * (len(header) - len(row))
-                    elif len(row) > len(header):
-                        row = row[:len(header)]
+                    if len(row) < num_cols:
+                        row += [''] * (num_cols - len(row))
+                    elif len(row) > num_cols:
+                        row = row[:num_cols]
 
                     # 获取唯一标识
                     unique_id = row[unique_index] if unique_index < len(row) else f"ROW{i+1}"
                     unique_prefix = f"[ID:{unique_id}] "
+
+                    # 整行清理特殊字符（map在C层迭代，唯一标识仍取原始值）
+                    chunks = chunk_row(
+                        header, header_lens, map(sanitize, row), unique_prefix,
+                        MAX_LEN, OVERHEAD_PADDING
+                    )
                     
-                    # 当前行内容块
-                    chunks = []
-                    current_chunk = unique_prefix
-                    current_chunk_length = len(unique_prefix)
-                    
-                    for field_idx, (field, value) in enumerate(zip(header, row)):
-                        # 清理特殊字符
-                        value = self._sanitize_value(value)
-                        
-                        # 检查字段长度
-                        field_header = f"{field}: "
-                        field_header_length = len(field_header)
-                        
-                        # 检查单个字段是否超长
-                        if len(value) > MAX_LEN - len(unique_prefix) - field_header_length - OVERHEAD_PADDING:
-                            segments = self._segment_long_field(
-                                unique_prefix, field, value, 
-                                MAX_LEN, field_header_length, OVERHEAD_PADDING
-                            )
-                            chunks.extend(segments)
-                            continue
-                        
-                        # 构建字段内容项
-                        item = f"{field}: {value}"
-                        item_length = len(item)
-                        
-                        # 检查添加后是否超过阈值
-                        if current_chunk_length + item_length + 2 > MAX_LEN:  # +2 为分隔符预留
-                            # 当前块接近满，完成当前块
-                            chunks.append(current_chunk.rstrip('; '))
-                            
-                            # 开始新块，包含唯一标识
-                            current_chunk = unique_prefix + item + '; '
-                            current_chunk_length = len(unique_prefix) + item_length + 2
-                        else:
-                            # 添加到当前块
-                            current_chunk += item + '; '
-                            current_chunk_length += item_length + 2
-                    
-                    # 添加最后一个块
-                    if current_chunk_length > len(unique_prefix):
-                        chunks.append(current_chunk.rstrip('; '))
-                    
-                    # 添加该行所有块到内容
-                    content.extend(chunks)
-            
-            return '\n'.join(content)
+                    # 产出该行所有块
+                    yield from chunks
 
         except Exception as e:
             raise FileCorruptionError(f"Error reading CSV file: {e}") from e
 
+    def _chunk_row(self, header: List[str], header_lens: List[int], values: Iterator[str],
+                   unique_prefix: str, max_len: int, padding: int) -> List[str]:
+        """
+        将一行字段按长度上限切分为文本块
+        行级状态机只使用参数与局部变量，逐字段循环中不做属性查找
+        :param header_lens: 各字段头"field: "的长度，与header一一对应
+        :param values: 已清理特殊字符的字段值
+        """
+        unique_prefix_len = len(unique_prefix)
+        # 单个字段值在不分段时允许的最大长度（不含字段头）
+        value_budget = max_len - unique_prefix_len - padding
+        
+        # 当前行内容块（字段项先收集到列表，落块时再一次性拼接）
+        chunks = []
+        parts: List[str] = []
+        running_len = unique_prefix_len
+        
+        for field, value, field_header_length in zip(header, values, header_lens):
+            # 检查单个字段是否超长
+            if len(value) > value_budget - field_header_length:
+                segments = self._segment_long_field(
+                    unique_prefix, field, value, 
+                    max_len, field_header_length, padding
+                )
+                chunks.extend(segments)
+                continue
+            
+            # 构建字段内容项
+            item = f"{field}: {value}"
+            item_length = field_header_length + len(value)
+            
+            # 检查添加后是否超过阈值
+            if running_len + item_length + 2 > max_len:  # +2 为分隔符预留
+                # 当前块接近满，完成当前块
+                chunks.append(unique_prefix + '; '.join(parts))
+                
+                # 开始新块，包含唯一标识
+                parts = [item]
+                running_len = unique_prefix_len + item_length + 2
+            else:
+                # 添加到当前块
+                parts.append(item)
+                running_len += item_length + 2
+        
+        # 添加最后一个块
+        if parts:
+            chunks.append(unique_prefix + '; '.join(parts))
+        
+        return chunks
+
+    @contextmanager
+    def _open_csv_text(self) -> Iterator[TextIO]:
+        """打开CSV文本流：小文件一次读入并整体解码，避免逐行调用增量解码器"""
+        file_size = os.path.getsize(self.file_path)
+        if file_size <= self.SLURP_MAX_SIZE:
+            text = ''
+            if file_size:  # 空文件无法mmap
+                # 直接从内存映射解码，省去read()产生的整份bytes副本
+                with open(self.file_path, 'rb') as raw, \
+                        mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'gbk', 'ignore')
+            # newline=None与文本模式打开一致，统一\r\n与\r为\n
+            yield io.StringIO(text, newline=None)
+        else:
+            with open(self.file_path, 'rb', buffering=self.READ_BUFFER_SIZE) as raw, \
+                    io.TextIOWrapper(raw, encoding='gbk', errors='ignore') as f:
+                yield f
+
     def _segment_long_field(self, unique_prefix: str, field: str, value: str, 
                        max_len: int, field_header_length: int, padding: int) -> List[str]:
         """分段处理超长字段值"""
         segments = []
-        segment_idx = 1
-        max_segment_length = max_len - len(unique_prefix) - field_header_length - len(f" [Part{segment_idx}]") - padding
+        prefix_len = len(unique_prefix)
+        # 分段头"field [PartN]: "中除序号N以外的固定长度
+        base_len = len(field) + len(" [Part") + len("]: ")
+        value_len = len(value)
+
+        # 分段值允许的最大长度只在序号位数变化（到达10、100…）时改变
+        idx_width = 1
+        next_width_at = 10
+        max_segment_value_length = max(max_len - prefix_len - base_len - idx_width, 1)
         
+        segment_idx = 1
         start = 0
-        while start < len(value):
-            # 计算当前分段允许的最大长度
-            segment_header = f"{field} [Part{segment_idx}]: "
-            max_segment_value_length = max_len - len(unique_prefix) - len(segment_header)
-            
-            # 确保不会出现负值
-            if max_segment_value_length <= 0:
-                max_segment_value_length = 1
+        while start < value_len:
+            if segment_idx == next_width_at:
+                idx_width += 1
+                next_width_at *= 10
+                # 确保不会出现负值
+                max_segment_value_length = max(max_len - prefix_len - base_len - idx_width, 1)
             
-            # 获取分段内容
+            # 创建分段项：前缀、分段头与分段内容一次拼接成单个字符串
             end = start + max_segment_value_length
-            segment_value = value[start:end]
-            
-            # 创建分段项
-            segment_item = unique_prefix + segment_header + segment_value
-            segments.append(segment_item)
+            segments.append(''.join((unique_prefix, field, ' [Part', str(segment_idx), ']: ', value[start:end])))
             
             # 更新索引
             start = end
@@ -150,13 +206,7 @@ class CSVProcessor(DocumentProcessor):
 
     def _sanitize_value(self, value: str) -> str:
         """清理值中的特殊字符"""
-        # 替换可能干扰的分隔符
-        replacements = {
-            ';': '；',  # 全角分号
-            '\n': '↵',  # 换行符替换
-            '\r': '',    # 移除回车符
-            '\t': '    ' # 制表符替换为空格
-        }
-        for orig, repl in replacements.items():
-            value = value.replace(orig, repl)
+        # 绝大多数值不含特殊字符：先做C层的子串查找，命中时才用translate构造新字符串
+        if ';' in value or '\n' in value or '\r' in value or '\t' in value:
+            return value.translate(self._TRANS)
         return value
@@ -1,7 +1,13 @@
 import os
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Any, Tuple, Iterator
 import openpyxl
 from openpyxl.worksheet.cell_range import CellRange
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # 可选依赖，仅calamine引擎需要
+    CalamineWorkbook = None
 from core import DocumentProcessor
 from exceptions import FileCorruptionError
 from utils.file_utils import validate_file_exists
@@ -9,20 +15,67 @@ from utils.file_utils import validate_file_exists
 class XLSXProcessor(DocumentProcessor):
     """处理Excel格式(XLSX)的处理器"""
     SUPPORTED_EXTENSIONS = ['xlsx', 'xlsm']
+    SUPPORTED_ENGINES = ['openpyxl', 'calamine']
+    # 启用并行时，工作表数达到该值才使用多进程（进程启动与重复打开工作簿有固定开销）
+    PARALLEL_MIN_SHEETS = 3
+    # 特殊字符替换表：单次translate完成全部替换
+    _TRANS = str.maketrans({
+        ';': '；',  # 全角分号
+        '\n': '↵',  # 换行符替换
+        '\r': '',    # 移除回车符
+        '\t': '    ' # 制表符替换为空格
+    })
     
-    def __init__(self, file_path: str, unique_key: str, max_len: int):
+    def __init__(self, file_path: str, unique_key: str, max_len: int, engine: str = 'openpyxl',
+                 parallel: bool = False):
+        """
+        :param engine: 文本提取使用的读取引擎
+            - openpyxl: 默认引擎，支持合并单元格与超链接处理
+            - calamine: 基于Rust的python-calamine，读取速度更快，
+              但不处理合并单元格/超链接，日期等类型的文本表示可能与openpyxl不同；
+              calamine将只含空白字符的单元格读为空值（整行只含空白时该行被跳过，唯一标识列为空白时改用ROW行号），
+              且行宽取到最后一个有数据的列，不含工作表尺寸(dimension)中末尾的空列，这些空列不会输出"列名: "字段
+        :param parallel: openpyxl引擎下是否用多进程并行处理多个工作表；
+            每个子进程独立打开工作簿，调用方脚本需有 if __name__ == "__main__" 保护
+        """
         super().__init__(file_path)
         validate_file_exists(file_path)
+        if engine not in self.SUPPORTED_ENGINES:
+            raise ValueError(f"Unsupported engine: {engine}")
+        if engine == 'calamine' and CalamineWorkbook is None:
+            raise ImportError("使用calamine引擎需要安装python-calamine")
         self.file_extension = os.path.splitext(file_path)[1][1:].lower()
         self.unique_key = unique_key
         self.max_len = max_len
+        self.engine = engine
+        self.parallel = parallel
         self.workbook = None
         self.merged_cells_cache = {}  # 缓存合并单元格信息
+        self._flags_cache = None  # 缓存元数据扫描结果
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """关闭工作簿并释放缓存；文本与元数据提取共用同一个已打开的工作簿，直到显式关闭"""
+        if self.workbook:
+            self.workbook.close()
+            self.workbook = None
+        self.merged_cells_cache.clear()
+        self._flags_cache = None
     
     def extract_text(self) -> str:
         """提取所有工作表的文本内容，用换页符分隔"""
         if self.file_extension in self.SUPPORTED_EXTENSIONS:
-            return self._extract_xlsx_text()
+            return '\n'.join(self.iter_text())
+
+    def iter_text(self) -> Iterator[str]:
+        """逐块产出文本内容（工作表标题行与各行文本块），内存占用与文件大小无关"""
+        if self.file_extension in self.SUPPORTED_EXTENSIONS:
+            yield from self._iter_xlsx_text()
     
     def extract_metadata(self) -> dict:
         """提取Excel元数据"""
@@ -32,9 +85,7 @@ class XLSXProcessor(DocumentProcessor):
                 'file_type': self.file_extension,
                 'sheet_count': len(self.workbook.sheetnames),
                 'sheet_names': self.workbook.sheetnames,
-                'has_formulas': self._check_has_formulas(),
-                'has_hyperlinks': self._check_has_hyperlinks(),
-                'has_merged_cells': self._check_has_merged_cells()
+                **self._scan_flags()
             }
             return meta
         except Exception as e:
@@ -53,30 +104,67 @@ class XLSXProcessor(DocumentProcessor):
             except Exception as e:
                 raise FileCorruptionError(f"Invalid XLSX file: {e}") from e
     
-    def _extract_xlsx_text(self) -> str:
+    def _iter_xlsx_text(self) -> Iterator[str]:
         """提取XLSX文本内容"""
+        if self.engine == 'calamine':
+            yield from self._iter_xlsx_text_calamine()
+            return
+
         try:
             self._load_workbook()
-            content = []
+            sheet_names = self.workbook.sheetnames
+
+            if self.parallel and len(sheet_names) >= self.PARALLEL_MIN_SHEETS:
+                yield from self._iter_sheets_parallel(sheet_names)
+                return
             
-            for sheet_name in self.workbook.sheetnames:
+            for sheet_name in sheet_names:
                 sheet = self.workbook[sheet_name]
                 # 预加载合并单元格信息
                 self._load_merged_cells(sheet_name, sheet)
-                sheet_content = self._process_sheet(sheet_name, sheet)
-                if sheet_content:
-                    content.append(f"=== Sheet: {sheet_name} ===")
-                    content.append(sheet_content)
-            
-            return '\n'.join(content)
+                yield from self._iter_sheet_text(sheet_name, self._process_sheet(sheet_name, sheet))
+        except Exception as e:
+            raise FileCorruptionError(f"Error processing XLSX: {e}") from e
+
+    def _iter_sheets_parallel(self, sheet_names: List[str]) -> Iterator[str]:
+        """多进程并行处理各工作表，按工作表原顺序产出文本"""
+        max_workers = min(len(sheet_names), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _process_sheet_worker,
+                repeat(self.file_path), sheet_names, repeat(self.unique_key), repeat(self.max_len)
+            )
+            for sheet_name, chunks in zip(sheet_names, results):
+                yield from self._iter_sheet_text(sheet_name, chunks)
+
+    def _iter_xlsx_text_calamine(self) -> Iterator[str]:
+        """使用python-calamine提取XLSX文本内容（快速路径）"""
+        try:
+            workbook = CalamineWorkbook.from_path(self.file_path)
+
+            for sheet_name in workbook.sheet_names:
+                # 保留数据区域前的空行空列，使行号（生成的ROW标识）与列字母同openpyxl一致，均从A1起算
+                raw_rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+                headers = self._make_headers(self._normalize_calamine_row(raw_rows[0])) if raw_rows else []
+                rows = (self._normalize_calamine_row(row) for row in raw_rows)
+                yield from self._iter_sheet_text(sheet_name, self._process_rows(sheet_name, headers, rows))
         except Exception as e:
             raise FileCorruptionError(f"Error processing XLSX: {e}") from e
-        finally:
-            # 确保关闭工作簿释放资源
-            if self.workbook:
-                self.workbook.close()
-                self.workbook = None
-            self.merged_cells_cache.clear()
+
+    @staticmethod
+    def _normalize_calamine_row(row) -> list:
+        """与openpyxl保持一致：空单元格为None，整数单元格为int（calamine读为''与float）"""
+        return [None if v == '' else int(v) if type(v) is float and v.is_integer() else v
+                for v in row]
+
+    def _iter_sheet_text(self, sheet_name: str, chunks: Iterator[str]) -> Iterator[str]:
+        """在工作表的首个文本块前产出标题行，空工作表不产出任何内容"""
+        header_emitted = False
+        for chunk in chunks:
+            if not header_emitted:
+                yield f"=== Sheet: {sheet_name} ==="
+                header_emitted = True
+            yield chunk
     
     def _load_merged_cells(self, sheet_name: str, sheet):
         """加载并缓存合并单元格信息（兼容只读模式）"""
@@ -97,22 +185,40 @@ class XLSXProcessor(DocumentProcessor):
         self.merged_cells_cache[sheet_name] = merged_map
     
     def _add_merged_range(self, merged_map: dict, merged_range):
-        """添加合并区域到映射表"""
-        top_left = (merged_range.min_row, merged_range.min_col)
+        """
+        添加合并区域到映射表
+        坐标打包为单个整数 (row << 20) | col 作为键和值，比元组哈希更快、占用更少内存
+        （Excel最多16384列，20位足够）
+        """
+        top_left = (merged_range.min_row << 20) | merged_range.min_col
         for row in range(merged_range.min_row, merged_range.max_row + 1):
+            row_key = row << 20
             for col in range(merged_range.min_col, merged_range.max_col + 1):
-                if (row, col) != top_left:
-                    merged_map[(row, col)] = top_left
+                key = row_key | col
+                if key != top_left:
+                    merged_map[key] = top_left
     
-    def _process_sheet(self, sheet_name: str, sheet) -> str:
+    def _process_sheet(self, sheet_name: str, sheet) -> Iterator[str]:
         """处理单个工作表"""
+        # 获取表头（第一行）
+        headers = self._get_headers(sheet)
+        # 只读模式下单元格不携带超链接信息，直接按值读取行，不构造单元格对象；
+        # 否则逐行产出单元格对象（每个单元格只读取一次），取值与超链接都从同一对象获取
+        has_hyperlinks = not sheet.parent.read_only
+        rows = sheet.iter_rows(values_only=not has_hyperlinks)
+        return self._process_rows(sheet_name, headers, rows, sheet, cell_rows=has_hyperlinks)
+
+    def _process_rows(self, sheet_name: str, headers: List[str], rows, sheet=None,
+                      cell_rows: bool = False) -> Iterator[str]:
+        """
+        将工作表的行数据逐块转换为文本
+        :param rows: 行序列；cell_rows为True时为openpyxl单元格行，否则为值行（如values_only的元组行、calamine的列表行）
+        :param sheet: openpyxl工作表，用于合并单元格处理；为None时跳过
+        :param cell_rows: 行是否为单元格对象，为True时同时处理超链接
+        """
         MAX_LEN = self.max_len
         UNIQUE_KEY = self.unique_key
         OVERHEAD_PADDING = 3
-        content = []
-        
-        # 获取表头（第一行）
-        headers = self._get_headers(sheet)
         
         # 查找唯一标识列索引
         unique_index = 0
@@ -124,49 +230,66 @@ class XLSXProcessor(DocumentProcessor):
         
         # 获取合并单元格映射
         merged_map = self.merged_cells_cache.get(sheet_name, {})
+        # 大多数工作表没有合并单元格，此时整张表跳过映射查找
+        has_merges = sheet is not None and bool(merged_map)
+
+        # 只有单元格对象行才携带超链接信息，值行整张表跳过超链接探测
+        has_hyperlinks = cell_rows
+
+        # 预先计算各表头字段头"field: "的长度，避免逐单元格重复计算
+        num_headers = len(headers)
+        header_lens = [len(h) + 2 for h in headers]
         
         # 处理每一行
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), 1):
-            # 跳过空行
-            if all(cell is None or cell == '' for cell in row):
+        for row_idx, row in enumerate(rows, 1):
+            # openpyxl单元格行：取出值，同时保留单元格对象用于超链接处理
+            if cell_rows:
+                cells = row
+                row = tuple(cell.value for cell in cells)
+            else:
+                cells = None
+
+            # 跳过空行：any()在C层短路判断，只有全部为假值的行（空行或全0行）才逐个精确检查
+            if not any(row) and all(cell is None or cell == '' for cell in row):
                 continue
                 
             # 获取唯一标识
             unique_id = self._get_unique_id(row, unique_index, row_idx)
             unique_prefix = f"[ID:{unique_id}] "
+            unique_prefix_len = len(unique_prefix)
             
             row_content = []
-            current_chunk = unique_prefix
-            current_chunk_length = len(unique_prefix)
+            parts: List[str] = []
+            running_len = unique_prefix_len
             
             for col_idx, cell_value in enumerate(row):
                 # 获取列名（使用表头或列字母）
-                if headers and col_idx < len(headers):
+                if col_idx < num_headers:
                     field = headers[col_idx]
+                    field_header_length = header_lens[col_idx]
                 else:
                     field = openpyxl.utils.get_column_letter(col_idx + 1)
+                    field_header_length = len(field) + 2
                 
-                # 处理合并单元格值
-                if (row_idx, col_idx + 1) in merged_map:
-                    main_row, main_col = merged_map[(row_idx, col_idx + 1)]
-                    # 如果是合并单元格但不是主单元格，则使用主单元格的值
-                    if (row_idx, col_idx + 1) != (main_row, main_col):
-                        cell_value = self._get_merged_cell_value(sheet, main_row, main_col)
+                # 处理合并单元格值（映射表只含非主单元格，命中时使用主单元格的值）
+                if has_merges:
+                    top_left = merged_map.get((row_idx << 20) | (col_idx + 1))
+                    if top_left is not None:
+                        cell_value = self._get_merged_cell_value(sheet, top_left >> 20, top_left & 0xFFFFF)
                 
                 # 处理特殊内容（链接、图片等）
-                processed_value = self._process_cell_value(cell_value, sheet.cell(row=row_idx, column=col_idx + 1))
+                cell = cells[col_idx] if has_hyperlinks else None
+                processed_value = self._process_cell_value(cell_value, cell)
                 
                 # 清理特殊字符
                 sanitized_value = self._sanitize_value(str(processed_value) if processed_value is not None else "")
                 
                 # 构建字段内容
-                field_header = f"{field}: "
-                field_header_length = len(field_header)
-                item = f"{field_header}{sanitized_value}"
-                item_length = len(item)
+                item = f"{field}: {sanitized_value}"
+                item_length = field_header_length + len(sanitized_value)
                 
                 # 检查是否超长需要分段
-                if len(unique_prefix) + item_length > MAX_LEN - OVERHEAD_PADDING:
+                if unique_prefix_len + item_length > MAX_LEN - OVERHEAD_PADDING:
                     segments = self._segment_long_field(
                         unique_prefix, field, sanitized_value, 
                         MAX_LEN, field_header_length, OVERHEAD_PADDING
@@ -175,21 +298,19 @@ class XLSXProcessor(DocumentProcessor):
                     continue
                 
                 # 检查当前块空间
-                if current_chunk_length + item_length + 2 > MAX_LEN:  # +2 为分隔符预留
-                    row_content.append(current_chunk.rstrip('; '))
-                    current_chunk = unique_prefix + item + '; '
-                    current_chunk_length = len(unique_prefix) + item_length + 2
+                if running_len + item_length + 2 > MAX_LEN:  # +2 为分隔符预留
+                    row_content.append(unique_prefix + '; '.join(parts))
+                    parts = [item]
+                    running_len = unique_prefix_len + item_length + 2
                 else:
-                    current_chunk += item + '; '
-                    current_chunk_length += item_length + 2
+                    parts.append(item)
+                    running_len += item_length + 2
             
             # 添加剩余内容
-            if current_chunk_length > len(unique_prefix):
-                row_content.append(current_chunk.rstrip('; '))
+            if parts:
+                row_content.append(unique_prefix + '; '.join(parts))
             
-            content.extend(row_content)
-        
-        return '\n'.join(content)
+            yield from row_content
     
     def _get_merged_cell_value(self, sheet, row: int, col: int):
         """获取合并单元格主单元格的值"""
@@ -207,11 +328,15 @@ class XLSXProcessor(DocumentProcessor):
         try:
             first_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), None)
             if first_row:
-                headers = [str(cell) if cell is not None else f"Column{idx+1}" 
-                          for idx, cell in enumerate(first_row)]
+                headers = self._make_headers(first_row)
         except StopIteration:
             pass
         return headers
+
+    def _make_headers(self, first_row) -> List[str]:
+        """根据首行值生成表头，空单元格使用ColumnN占位"""
+        return [str(cell) if cell is not None else f"Column{idx+1}" 
+                for idx, cell in enumerate(first_row)]
     
     def _get_unique_id(self, row, unique_index, row_idx) -> str:
         """获取行唯一标识"""
@@ -221,16 +346,20 @@ class XLSXProcessor(DocumentProcessor):
     
     def _process_cell_value(self, value, cell=None) -> str:
         """处理特殊单元格内容"""
-        # 处理超链接 - 检查cell是否有hyperlink属性
-        if cell and hasattr(cell, 'hyperlink') and cell.hyperlink:
-            return f"{value or ''} [Link:{cell.hyperlink.target or cell.hyperlink.location}]"
+        # 处理超链接 - 只读模式下的单元格没有hyperlink属性
+        if cell is not None:
+            hyperlink = getattr(cell, 'hyperlink', None)
+            if hyperlink:
+                return f"{value or ''} [Link:{hyperlink.target or hyperlink.location}]"
         
-        # 处理公式生成的图片
-        if isinstance(value, str) and value.startswith('=IMAGE('):
-            return "[Image]"
-        
-        # 处理布尔值
-        if isinstance(value, bool):
+        # 按精确类型分派，绝大多数单元格（数值、None）直接落到末尾返回
+        value_type = type(value)
+        if value_type is str:
+            # 处理公式生成的图片
+            if value[:7] == '=IMAGE(':
+                return "[Image]"
+        elif value_type is bool:
+            # 处理布尔值
             return "TRUE" if value else "FALSE"
         
         return value
@@ -239,22 +368,30 @@ class XLSXProcessor(DocumentProcessor):
                            max_len: int, field_header_length: int, padding: int) -> List[str]:
         """分段处理超长字段值"""
         segments = []
-        segment_idx = 1
-        max_segment_value_length = max_len - len(unique_prefix) - len(f"{field} [Part{segment_idx}]: ") - padding
+        prefix_len = len(unique_prefix)
+        # 分段头"field [PartN]: "中除序号N以外的固定长度
+        base_len = len(field) + len(" [Part") + len("]: ")
+        value_len = len(value)
+
+        # 分段值允许的最大长度只在序号位数变化（到达10、100…）时改变
+        idx_width = 1
+        next_width_at = 10
+        max_segment_value_length = max(max_len - prefix_len - base_len - idx_width - padding, 1)
         
+        segment_idx = 1
         start = 0
-        while start < len(value):
-            segment_header = f"{field} [Part{segment_idx}]: "
-            max_segment_value_length = max_len - len(unique_prefix) - len(segment_header) - padding
+        while start < value_len:
+            if segment_idx == next_width_at:
+                idx_width += 1
+                next_width_at *= 10
+                # 确保不会出现负值
+                max_segment_value_length = max(max_len - prefix_len - base_len - idx_width - padding, 1)
             
-            if max_segment_value_length <= 0:
-                max_segment_value_length = 1
-                
+            # 创建分段项：前缀、分段头与分段内容一次拼接成单个字符串
             end = start + max_segment_value_length
-            segment_value = value[start:end]
-            
-            segments.append(unique_prefix + segment_header + segment_value)
+            segments.append(''.join((unique_prefix, field, ' [Part', str(segment_idx), ']: ', value[start:end])))
             
+            # 更新索引
             start = end
             segment_idx += 1
         
@@ -262,40 +399,58 @@ class XLSXProcessor(DocumentProcessor):
     
     def _sanitize_value(self, value: str) -> str:
         """清理值中的特殊字符"""
-        replacements = {
-            ';': '；',
-            '\n': '↵',
-            '\r': '',
-            '\t': '    '
-        }
-        for orig, repl in replacements.items():
-            value = value.replace(orig, repl)
+        # 绝大多数值不含特殊字符：先做C层的子串查找，命中时才用translate构造新字符串
+        if ';' in value or '\n' in value or '\r' in value or '\t' in value:
+            return value.translate(self._TRANS)
         return value
     
-    def _check_has_formulas(self) -> bool:
-        """检查是否包含公式"""
-        for sheet in self.workbook:
-            for row in sheet.iter_rows():
-                for cell in row:
-                    if cell.data_type == 'f':
-                        return True
-        return False
-    
-    def _check_has_hyperlinks(self) -> bool:
-        """检查是否包含超链接"""
+    def _scan_flags(self) -> dict:
+        """单次遍历工作簿，同时检测公式、超链接与合并单元格（结果缓存至close）"""
+        if self._flags_cache is not None:
+            return self._flags_cache
+
+        # data_only模式下公式单元格只保留计算值，只读模式下单元格不携带超链接，
+        # 对应标志不可能为真，无需为其扫描单元格
+        check_formulas = not self.workbook.data_only
+        check_hyperlinks = not self.workbook.read_only
+        has_formulas = has_hyperlinks = has_merged_cells = False
+
         for sheet in self.workbook:
+            # 兼容只读模式
+            if not has_merged_cells and (
+                (hasattr(sheet, 'merged_cells') and sheet.merged_cells.ranges)
+                or (hasattr(sheet, 'merged_cell_ranges') and sheet.merged_cell_ranges)
+            ):
+                has_merged_cells = True
+
+            if not (check_formulas or check_hyperlinks):
+                continue
+
             for row in sheet.iter_rows():
                 for cell in row:
-                    if cell.hyperlink:
-                        return True
-        return False
-    
-    def _check_has_merged_cells(self) -> bool:
-        """检查是否包含合并单元格"""
-        for sheet in self.workbook:
-            # 兼容只读模式
-            if hasattr(sheet, 'merged_cells') and sheet.merged_cells.ranges:
-                return True
-            if hasattr(sheet, 'merged_cell_ranges') and sheet.merged_cell_ranges:
-                return True
-        return False
\ No newline at end of file
+                    if check_formulas and cell.data_type == 'f':
+                        has_formulas = True
+                        check_formulas = False
+                    if check_hyperlinks and getattr(cell, 'hyperlink', None):
+                        has_hyperlinks = True
+                        check_hyperlinks = False
+                    if not (check_formulas or check_hyperlinks):
+                        break
+                if not (check_formulas or check_hyperlinks):
+                    break
+
+        self._flags_cache = {
+            'has_formulas': has_formulas,
+            'has_hyperlinks': has_hyperlinks,
+            'has_merged_cells': has_merged_cells
+        }
+        return self._flags_cache
+
+
+def _process_sheet_worker(file_path: str, sheet_name: str, unique_key: str, max_len: int) -> List[str]:
+    """子进程入口：独立打开工作簿并处理单个工作表，返回该表的文本块"""
+    with XLSXProcessor(file_path, unique_key, max_len) as processor:
+        processor._load_workbook()
+        sheet = processor.workbook[sheet_name]
+        processor._load_merged_cells(sheet_name, sheet)
+        return list(processor._process_sheet(sheet_name, sheet))
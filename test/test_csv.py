@@ -15,7 +15,7 @@ def simple_test_extract_csv_text():
 
     for input_path, output_path in test_files:
         processor = CSVProcessor(file_path=input_path, unique_key="OrderID", max_len=350)
-        result = processor.extract_text()
+        result = processor.iter_text()
         save_to_file(output_path, result, encoding="utf-8")
         print(f"✅ 已处理并保存：{input_path} → {output_path}")
 
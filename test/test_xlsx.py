@@ -12,9 +12,8 @@ def simple_test_extract_xlsx_text():
     ]
 
     for input_path, output_path in test_files:
-        processor = XLSXProcessor(file_path=input_path, unique_key="OrderID", max_len=350)
-        result = processor.extract_text()
-        save_to_file(output_path, result, encoding="utf-8")
+        with XLSXProcessor(file_path=input_path, unique_key="OrderID", max_len=350) as processor:
+            save_to_file(output_path, processor.iter_text(), encoding="utf-8")
         print(f"✅ 已处理并保存：{input_path} → {output_path}")
 
 # 运行测试
@@ -1,4 +1,5 @@
 import os
+from typing import Iterable, Union
 
 def validate_file_exists(file_path: str):
     """验证文件是否存在且可访问"""
@@ -7,7 +8,22 @@ def validate_file_exists(file_path: str):
     if not os.access(file_path, os.R_OK):
         raise PermissionError(f"Access denied to file: {file_path}")
 
-def save_to_file(save_path: str, content: str, encoding: str = "utf-8"):
-    """将字符串内容保存到指定文件"""
-    with open(save_path, "w", encoding=encoding) as f:
-        f.write(content)
+# 写文件缓冲区大小：流式写入大量小块文本时，按块累积后再落盘，减少write系统调用
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+def save_to_file(save_path: str, content: Union[str, Iterable[str]], encoding: str = "utf-8"):
+    """
+    将字符串内容保存到指定文件
+    :param content: 完整字符串，或逐块产出文本的可迭代对象（如processor.iter_text()），
+                    后者逐块写入、块间以换行分隔，结果与一次性拼接后写入一致
+    """
+    with open(save_path, "w", encoding=encoding, buffering=WRITE_BUFFER_SIZE) as f:
+        if isinstance(content, str):
+            f.write(content)
+            return
+
+        chunks = iter(content)
+        first = next(chunks, None)
+        if first is not None:
+            f.write(first)
+            f.writelines('\n' + chunk for chunk in chunks)
@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import hmac
+import threading
+from typing import Optional
+from aiohttp import web
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # 可选依赖，未安装时使用标准库解析JSON
+    from json import loads as json_loads
+
+from utils.mineru_utils import MinerUProcessor
+
+class CallbackServer:
+    """
+    接收MinerU解析结果回调的简易Web服务（aiohttp，运行在后台线程）
+    收到回调后交给MinerUProcessor.notify_callback，唤醒以wait="callback"等待的get_batch_results
+    用法:
+        server = CallbackServer(processor, port=8080).start()
+        batch_ids = processor.upload_files(files, callback="http://公网地址:8080/mineru/callback", seed="abc")
+        results = processor.get_batch_results(batch_ids, wait="callback")
+        server.stop()
+    """
+    def __init__(
+        self,
+        processor: MinerUProcessor,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/mineru/callback",
+        uid: Optional[str] = None,
+        seed: Optional[str] = None
+    ):
+        """
+        :param processor: 需要被唤醒的处理器实例
+        :param uid: MinerU账号uid，与seed同时提供时校验回调的checksum
+        :param seed: 上传/提交任务时使用的seed
+        """
+        self.processor = processor
+        self.host = host
+        self.port = port
+        self.path = path
+        self.uid = uid
+        self.seed = seed
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CallbackServer":
+        """在后台线程中启动服务，端口就绪后返回"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._serve())
+            except Exception as e:
+                # 启动失败（如端口被占用）时释放事件循环，stop()据此直接返回
+                errors.append(e)
+                self._loop.close()
+                self._loop = None
+                self._runner = None
+                return
+            finally:
+                started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="mineru-callback", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        print(f"回调服务已启动: http://{self.host}:{self.port}{self.path}")
+        return self
+
+    def stop(self) -> None:
+        """停止服务并等待后台线程退出"""
+        # 未启动或启动失败时无需清理
+        if self._loop is None or self._runner is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop)
+        future.result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._runner = None
+
+    async def _serve(self) -> None:
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """回调请求体包含checksum与content（JSON字符串），content为任务结果"""
+        if request.content_type == "application/json":
+            body = await request.json(loads=json_loads)
+        else:
+            body = await request.post()
+
+        content = body.get("content", "")
+        if self.uid and self.seed:
+            expected = hashlib.sha256(f"{self.uid}{self.seed}{content}".encode("utf-8")).hexdigest()
+            if not hmac.compare_digest(expected, body.get("checksum", "")):
+                return web.Response(status=403, text="checksum mismatch")
+
+        try:
+            result = json_loads(content) if isinstance(content, (str, bytes)) else content
+        except ValueError:
+            return web.Response(status=400, text="invalid content")
+
+        self.processor.notify_callback(result if isinstance(result, dict) else {})
+        return web.json_response({"code": 0, "msg": "ok"})
@@ -1,16 +1,355 @@
 import os
+import sys
+import gzip
+import hashlib
+import mmap
+import shutil
+import stat
+import asyncio
+import random
+import aiofiles
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, zip_longest
+from typing import Callable, List, Dict, NamedTuple, Optional, Tuple, Union
 from dotenv import load_dotenv
+from exceptions import BatchSubmitError
+
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:  # 可选依赖，未安装时使用标准库解析JSON
+    from json import dumps, loads as _json_loads
+
+    def _json_dumps(obj) -> bytes:
+        return dumps(obj, ensure_ascii=False).encode('utf-8')
 
 # 加载环境变量
 load_dotenv()
 
-class MinerUProcessor:
+# 单个批量任务允许的最大文件数（API限制）
+MAX_BATCH_SIZE = 200
+
+# 可选参数列表中缺少对应项的占位值
+_MISSING = object()
+
+def _unwrap_result(status_code: int, content: bytes) -> Dict:
+    """校验API响应的HTTP状态码与业务码，返回data字段"""
+    if status_code != 200:
+        # 只截取响应开头用于报错，避免整体解码
+        body = content[:512].decode('utf-8', 'replace')
+        raise Exception(f"API请求失败，状态码: {status_code}, 响应: {body}")
+    
+    # 直接解析原始字节，省去先解码为str的开销
+    result = _json_loads(content)
+    # 成功时只做一次取值判断，错误信息仅在失败时构造
+    error_code = result.get('code', '')
+    if error_code == 0:
+        return result['data']
+    raise Exception(
+        f"业务错误 [{error_code}]: {result.get('msg', '未知错误')}, trace_id: {result.get('trace_id', '')}"
+    )
+
+def _stat_files(file_paths: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    对每个文件执行一次stat，校验文件存在且为普通文件，避免申请上传URL后才发现文件缺失
+    :return: (文件名列表, 文件大小列表)，与file_paths一一对应
+    """
+    file_names = []
+    file_sizes = []
+    missing = []
+    for path in file_paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            missing.append(path)
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            missing.append(path)
+            continue
+        file_names.append(os.path.basename(path))
+        file_sizes.append(st.st_size)
+    
+    if missing:
+        raise FileNotFoundError(f"以下文件不存在或不是普通文件: {', '.join(missing)}")
+    return file_names, file_sizes
+
+def _file_digest(file_path: str) -> bytes:
+    """计算文件内容的SHA-256，通过mmap直接映射文件，避免读入缓冲区的拷贝"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).digest()
+
+def _find_duplicates(file_paths: List[str], file_sizes: List[int], files_data: List[Dict]) -> Dict[int, int]:
+    """
+    找出内容相同且解析参数（is_ocr、page_ranges）相同的文件：
+    只有大小和解析参数都相同的文件才需要计算哈希，同一路径只计算一次，
+    哈希在线程池中并行计算（hashlib处理大块数据时释放GIL）
+    :return: 重复文件下标 -> 首个可合并文件的下标
+    """
+    by_key = {}
+    for i, size in enumerate(file_sizes):
+        options = (files_data[i].get('is_ocr'), files_data[i].get('page_ranges'))
+        by_key.setdefault((size, options), []).append(i)
+    candidates = sorted(i for indices in by_key.values() if len(indices) > 1 for i in indices)
+    if not candidates:
+        return {}
+    
+    real_paths = {i: os.path.realpath(file_paths[i]) for i in candidates}
+    unique_paths = list(dict.fromkeys(real_paths.values()))
+    with ThreadPoolExecutor() as executor:
+        digests = dict(zip(unique_paths, executor.map(_file_digest, unique_paths)))
+    
+    first_seen = {}
+    duplicates = {}
+    for i in candidates:
+        options = (files_data[i].get('is_ocr'), files_data[i].get('page_ranges'))
+        key = (file_sizes[i], options, digests[real_paths[i]])
+        if key in first_seen:
+            duplicates[i] = first_seen[key]
+        else:
+            first_seen[key] = i
+    return duplicates
+
+def _drop_duplicates(
+    file_paths: List[str],
+    file_sizes: List[int],
+    files_data: List[Dict],
+    duplicates: Dict[int, int]
+) -> Tuple[List[str], List[int], List[Dict], List[Tuple[int, Dict]]]:
+    """
+    从待上传列表中去掉重复文件
+    :return: (去重后的路径, 大小, files参数, [(首个相同文件在去重后列表中的位置, 重复文件的files参数)])
+    """
+    kept_positions = {}
+    kept_paths = []
+    kept_sizes = []
+    kept_files_data = []
+    for i, path in enumerate(file_paths):
+        if i in duplicates:
+            continue
+        kept_positions[i] = len(kept_paths)
+        kept_paths.append(path)
+        kept_sizes.append(file_sizes[i])
+        kept_files_data.append(files_data[i])
+    
+    pairs = [(kept_positions[first], files_data[dup]) for dup, first in duplicates.items()]
+    return kept_paths, kept_sizes, kept_files_data, pairs
+
+def _build_files_data(
+    file_names: List[str],
+    is_ocr_list: Optional[List[bool]],
+    data_ids: Optional[List[str]],
+    page_ranges: Optional[List[str]]
+) -> List[Dict]:
+    """构建上传请求中的files参数，未指定is_ocr的文件默认不启用OCR"""
+    return _zip_files_data("name", file_names, is_ocr_list, data_ids, page_ranges, ocr_default=False)
+
+def _zip_files_data(
+    key: str,
+    values: List[str],
+    is_ocr_list: Optional[List[bool]],
+    data_ids: Optional[List[str]],
+    page_ranges: Optional[List[str]],
+    ocr_default=_MISSING
+) -> List[Dict]:
+    """
+    将文件名/URL与各可选参数列表按位置合并为files参数
+    可选列表可以比values短（缺少的项不写入）或更长（多余的项忽略）
+    """
+    rows = islice(
+        zip_longest(values, is_ocr_list or (), data_ids or (), page_ranges or (), fillvalue=_MISSING),
+        len(values)
+    )
+    files_data = []
+    for value, is_ocr, data_id, page_range in rows:
+        file_info = {key: value}
+    
+        # 添加可选参数
+        if is_ocr is _MISSING:
+            is_ocr = ocr_default
+        if is_ocr is not _MISSING:
+            file_info["is_ocr"] = is_ocr
+        if data_id is not _MISSING:
+            file_info["data_id"] = data_id
+        if page_range is not _MISSING:
+            file_info["page_ranges"] = page_range
+    
+        files_data.append(file_info)
+    return files_data
+
+def _build_payload(
+    files_data: List[Dict],
+    enable_formula: bool,
+    enable_table: bool,
+    language: str,
+    callback: Optional[str],
+    seed: Optional[str],
+    extra_formats: Optional[List[str]],
+    model_version: str
+) -> Dict:
+    """构建请求体"""
+    payload = {
+        "enable_formula": enable_formula,
+        "enable_table": enable_table,
+        "language": language,
+        "files": files_data,
+        "model_version": model_version
+    }
+    
+    # 添加可选全局参数
+    if callback:
+        payload["callback"] = callback
+    if seed:
+        payload["seed"] = seed
+    if extra_formats:
+        payload["extra_formats"] = extra_formats
+    return payload
+
+def _all_finished(tasks: List[Dict]) -> bool:
+    """所有任务是否都已结束（成功或失败）"""
+    for task in tasks:
+        if task['state'] not in ['done', 'failed']:
+            return False
+    return True
+
+def _summarize_progress(tasks: List[Dict]) -> Tuple[Tuple[int, int], str]:
+    """
+    汇总批次进度
+    :return: ((已结束任务数, 已解析总页数), 用于显示的进度描述)
+    """
+    progress_info = []
+    finished_count = 0
+    extracted_pages = 0
+    for task in tasks:
+        if task['state'] in ['done', 'failed']:
+            finished_count += 1
+        elif task['state'] == 'running' and 'extract_progress' in task:
+            progress = task['extract_progress']
+            extracted_pages += progress['extracted_pages']
+            progress_info.append(
+                f"{task['file_name']}: {progress['extracted_pages']}/{progress['total_pages']}页"
+            )
+    
+    status = ", ".join(progress_info) if progress_info else "等待中"
+    return (finished_count, extracted_pages), status
+
+def _split_gathered(results: List) -> Tuple[List, List[Optional[Exception]]]:
+    """将gather(return_exceptions=True)的结果拆分为(各组结果，失败组为None, 各组异常，成功组为None)"""
+    values = []
+    errors = []
+    for result in results:
+        if isinstance(result, Exception):
+            values.append(None)
+            errors.append(result)
+        elif isinstance(result, BaseException):
+            # 取消等非普通异常照常抛出
+            raise result
+        else:
+            values.append(result)
+            errors.append(None)
+    return values, errors
+
+def _check_group_errors(batch_ids: List[Optional[str]], errors: List[Optional[Exception]]) -> None:
+    """
+    有分组失败时抛出BatchSubmitError，异常的batch_ids为已成功创建的批量任务ID，避免丢失已提交的批次
+    :param batch_ids: 各组的batch_id，失败组为None
+    :param errors: 各组的异常，成功组为None
+    """
+    failed = [index + 1 for index, error in enumerate(errors) if error is not None]
+    if not failed:
+        return
+    created = [batch_id for batch_id in batch_ids if batch_id is not None]
+    first_error = errors[failed[0] - 1]
+    raise BatchSubmitError(
+        f"共{len(errors)}组，第{', '.join(map(str, failed))}组提交失败: {first_error}；"
+        f"已创建的batch_id: {', '.join(created) or '无'}",
+        created
+    ) from first_error
+
+def _split_payloads(payload: Dict, files_data: List[Dict], group_size: int = MAX_BATCH_SIZE) -> List[Dict]:
+    """按group_size将files参数分组，每组生成一个请求体"""
+    return [
+        {**payload, "files": files_data[start:start + group_size]}
+        for start in range(0, len(files_data), group_size)
+    ]
+
+def _backoff_delay(interval: float, backoff_exp: int) -> float:
+    """带随机抖动的指数退避间隔"""
+    return interval * (2 ** backoff_exp) + random.uniform(0, interval)
+
+def _upload_progress_reporter(total_size: int) -> Callable[[int], None]:
+    """返回上传进度回调：按已上传成功文件的字节数统计，每跨过10%输出一次"""
+    uploaded_size = 0
+    last_decile = 0
+    
+    def on_uploaded(file_size: int):
+        nonlocal uploaded_size, last_decile
+        uploaded_size += file_size
+        decile = uploaded_size * 10 // total_size if total_size else 10
+        if decile != last_decile:
+            last_decile = decile
+            print(f"上传进度: {decile * 10}% ({uploaded_size}/{total_size}字节)")
+    
+    return on_uploaded
+
+class _UploadPlan(NamedTuple):
+    """上传前的准备结果：各组(文件路径, 文件大小, 请求体)及汇总结果所需信息"""
+    groups: List[Tuple[List[str], List[int], Dict]]
+    total_size: int
+    group_size: int
+    files_data: List[Dict]
+    duplicate_pairs: List[Tuple[int, Dict]]
+    original_count: int
+
+class _PollSchedule:
+    """
+    轮询的超时预算与退避状态，同步与异步轮询共用
+    有进展时回到基础间隔，否则指数退避并加入随机抖动（最多2^5倍）
+    """
+    def __init__(self, interval: float, budget: float):
+        self.interval = interval
+        self.budget = budget
+        self.deadline = time.monotonic() + budget
+        self.backoff_exp = 0
+        self.last_progress = None
+        self.attempt = 0
+
+    def next_delay(self, tasks: List[Dict]) -> Optional[float]:
+        """根据本次查询到的未全部结束的任务，返回下次查询前的等待秒数；已超出预算时返回None"""
+        self.attempt += 1
+        current_progress, status = _summarize_progress(tasks)
+        if current_progress != self.last_progress:
+            self.backoff_exp = 0
+            delay = self.interval
+        else:
+            self.backoff_exp = min(self.backoff_exp + 1, 5)
+            delay = _backoff_delay(self.interval, self.backoff_exp)
+        self.last_progress = current_progress
+        
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        delay = min(delay, remaining)
+        
+        print(f"[第{self.attempt}次查询] 任务进行中: {status}... {delay:.0f}秒后重试")
+        return delay
+
+    def timeout_error(self) -> TimeoutError:
+        """超出等待预算时抛出的异常"""
+        return TimeoutError(f"获取结果超时（已等待{self.budget}秒），请稍后手动查询")
+
+class _MinerUBase:
+    """同步与异步处理器共用的配置读取及OSS上传逻辑"""
     def __init__(self, base_url: str = None):
         """
-        初始化MinerU处理类，从环境变量读取配置
+        读取API地址、鉴权及上传下载相关配置
         """
         # 从环境变量获取配置，优先使用参数值
         self.api_token = os.getenv("MINERU_API_TOKEN")
@@ -23,25 +362,239 @@ class MinerUProcessor:
         # 轮询配置（可从环境变量覆盖）
         self.max_retries = int(os.getenv("MINERU_MAX_RETRIES", 30))
         self.retry_interval = int(os.getenv("MINERU_RETRY_INTERVAL", 10))
+        # 并发上传的最大文件数
+        self.upload_workers = int(os.getenv("MINERU_UPLOAD_WORKERS", 8))
+        # 上传时每次从磁盘读取的块大小
+        self.upload_chunk_size = 1024 * 1024
+        # 单个文件上传的最大尝试次数
+        self.upload_attempts = 3
+        # 是否以gzip压缩API请求体（需服务端支持Content-Encoding: gzip，返回415时自动关闭）
+        self.compress_requests = os.getenv("MINERU_COMPRESS_REQUESTS", "false").lower() == "true"
+        # 请求体超过该大小才压缩
+        self.compress_min_size = 1024
+        # 分段并发下载的线程数，及启用分段下载的最小文件大小
+        self.download_workers = int(os.getenv("MINERU_DOWNLOAD_WORKERS", 4))
+        self.download_min_range_size = 8 * 1024 * 1024
+        # 下载时每次写入磁盘的块大小
+        self.download_chunk_size = 1024 * 1024
         
         self.headers = {
             'Authorization': f'Bearer {self.api_token}',
             'Content-Type': 'application/json',
             'Accept': '*/*'
         }
+        
+        # 查询结果时只接受JSON
+        self._poll_headers = {**self.headers, 'Accept': 'application/json'}
+        
+        # 上传时去掉的重复文件：batch_id -> [(实际上传文件的files参数, 重复文件的files参数)]，获取结果时按此回填
+        self._duplicates: Dict[str, List[Tuple[Dict, Dict]]] = {}
+        
+        # 轮询结果的条件请求缓存：batch_id -> 上次响应的ETag及对应数据
+        self._last_etag: Dict[str, str] = {}
+        self._last_data: Dict[str, Dict] = {}
+
+    def _forget_batch(self, batch_id: str) -> None:
+        """批次结束后清理轮询缓存"""
+        self._last_etag.pop(batch_id, None)
+        self._last_data.pop(batch_id, None)
+
+    def _dedupe_upload(
+        self,
+        file_paths: List[str],
+        file_sizes: List[int],
+        files_data: List[Dict]
+    ) -> Tuple[List[str], List[int], List[Dict], List[Tuple[int, Dict]]]:
+        """按内容哈希及解析参数去掉重复文件，返回值同_drop_duplicates"""
+        duplicates = _find_duplicates(file_paths, file_sizes, files_data)
+        if not duplicates:
+            return file_paths, file_sizes, files_data, []
+        print(f"检测到{len(duplicates)}个重复文件，只上传一次，获取结果时按原文件回填")
+        return _drop_duplicates(file_paths, file_sizes, files_data, duplicates)
+
+    def _remember_duplicates(
+        self,
+        batch_ids: List[str],
+        group_size: int,
+        files_data: List[Dict],
+        pairs: List[Tuple[int, Dict]]
+    ) -> None:
+        """记录重复文件所对应的实际上传文件及其所在批次（batch_ids中失败组为None，跳过）"""
+        for position, duplicate_info in pairs:
+            batch_id = batch_ids[position // group_size]
+            if batch_id is None:
+                continue
+            self._duplicates.setdefault(batch_id, []).append((files_data[position], duplicate_info))
+
+    def _prepare_upload(
+        self,
+        file_paths: List[str],
+        is_ocr_list: Optional[List[bool]],
+        data_ids: Optional[List[str]],
+        page_ranges: Optional[List[str]],
+        payload: Dict,
+        group_size: int,
+        dedupe: bool
+    ) -> _UploadPlan:
+        """校验文件并构建files参数，按需去重后按group_size分组（含阻塞的文件系统调用）"""
+        if not 1 <= group_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"group_size必须在1到{MAX_BATCH_SIZE}之间")
+        
+        file_names, file_sizes = _stat_files(file_paths)
+        
+        files_data = _build_files_data(file_names, is_ocr_list, data_ids, page_ranges)
+        original_count = len(file_paths)
+        duplicate_pairs = []
+        if dedupe:
+            file_paths, file_sizes, files_data, duplicate_pairs = self._dedupe_upload(file_paths, file_sizes, files_data)
+        groups = [
+            (
+                file_paths[start:start + group_size],
+                file_sizes[start:start + group_size],
+                {**payload, "files": files_data[start:start + group_size]}
+            )
+            for start in range(0, len(file_paths), group_size)
+        ]
+        return _UploadPlan(groups, sum(file_sizes), group_size, files_data, duplicate_pairs, original_count)
+
+    def _finish_upload(
+        self,
+        batches: List[Tuple[Optional[str], List[bool]]],
+        errors: List[Optional[Exception]],
+        plan: _UploadPlan
+    ) -> List[str]:
+        """汇总各组上传结果：记录重复文件映射并输出统计，有分组失败时抛出BatchSubmitError"""
+        success_count = sum(sum(results) for _, results in batches)
+        batch_ids = [batch_id for batch_id, _ in batches]
+        self._remember_duplicates(batch_ids, plan.group_size, plan.files_data, plan.duplicate_pairs)
+        created = [batch_id for batch_id in batch_ids if batch_id is not None]
+        if created:
+            file_count = len(plan.files_data)
+            dedupe_info = f"（共{plan.original_count}个文件，去重后{file_count}个）" if plan.duplicate_pairs else ""
+            print(f"批量上传完成! 成功上传 {success_count}/{file_count} 个文件{dedupe_info}, batch_id: {', '.join(created)}")
+        _check_group_errors(batch_ids, errors)
+        return batch_ids
+
+    @staticmethod
+    def _finish_submit(batch_ids: List[Optional[str]], errors: List[Optional[Exception]]) -> List[str]:
+        """汇总各组URL提交结果，有分组失败时抛出BatchSubmitError"""
+        created = [batch_id for batch_id in batch_ids if batch_id is not None]
+        if created:
+            print(f"URL批量任务提交成功! batch_id: {', '.join(created)}")
+        _check_group_errors(batch_ids, errors)
+        return batch_ids
+
+    def clear_duplicates(self, batch_id: str) -> None:
+        """不再查询该批次时调用，释放上传去重记录的重复文件映射"""
+        self._duplicates.pop(batch_id, None)
+
+    def _expand_duplicates(self, batch_id: str, tasks: List[Dict]) -> List[Dict]:
+        """将实际上传文件的解析结果复制给上传时去掉的重复文件（映射保留，重复查询同一批次结果一致）"""
+        pairs = self._duplicates.get(batch_id)
+        if not pairs:
+            return tasks
+        
+        # 优先按文件名+data_id匹配，结果中不含data_id时退回按文件名匹配
+        by_file = {(task.get('file_name'), task.get('data_id') or ''): task for task in tasks}
+        by_name = {}
+        for task in tasks:
+            by_name.setdefault(task.get('file_name'), task)
+        
+        tasks = list(tasks)
+        for uploaded_info, duplicate_info in pairs:
+            task = by_file.get((uploaded_info['name'], uploaded_info.get('data_id') or ''))
+            if task is None:
+                task = by_name.get(uploaded_info['name'])
+            if task is None:
+                continue
+            duplicate_task = {**task, 'file_name': duplicate_info['name']}
+            duplicate_task.pop('data_id', None)
+            if 'data_id' in duplicate_info:
+                duplicate_task['data_id'] = duplicate_info['data_id']
+            tasks.append(duplicate_task)
+        return tasks
+
+    async def _put_one(
+        self,
+        session: aiohttp.ClientSession,
+        sem: asyncio.Semaphore,
+        file_path: str,
+        file_size: int,
+        upload_url: str,
+        on_uploaded: Callable[[int], None]
+    ) -> bool:
+        """
+        上传单个文件，连接异常或服务端临时错误(5xx/429)时按2^n秒退避重试，返回是否成功
+        :param on_uploaded: 上传成功后以文件大小调用，用于统计整体进度
+        """
+        async with sem:
+            # 文件按块流式发送，内存占用与文件大小无关；显式给出Content-Length，避免分块传输编码
+            headers = {'Content-Length': str(file_size)}
+            
+            for attempt in range(self.upload_attempts):
+                try:
+                    # 预签名URL的签名不含Content-Type，不能让aiohttp自动添加
+                    # 每次尝试重新创建读取器，从文件开头发送
+                    async with session.put(
+                        upload_url,
+                        data=self._file_sender(file_path),
+                        headers=headers,
+                        skip_auto_headers=['Content-Type']
+                    ) as response:
+                        if response.status == 200:
+                            on_uploaded(file_size)
+                            return True
+                        failure = f"警告: 文件 {file_path} 上传失败 (状态码: {response.status})"
+                        # 其余4xx（如签名失效）重试也无法成功
+                        if response.status < 500 and response.status != 429:
+                            break
+                except Exception as e:
+                    failure = f"文件 {file_path} 上传异常: {str(e)}"
+                
+                if attempt < self.upload_attempts - 1:
+                    await asyncio.sleep(2 ** attempt)
+        
+        print(failure)
+        return False
+
+    async def _file_sender(self, file_path: str):
+        """按块异步读取文件（读取在线程中进行，不阻塞事件循环）"""
+        async with aiofiles.open(file_path, 'rb') as f:
+            while True:
+                chunk = await f.read(self.upload_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+class MinerUProcessor(_MinerUBase):
+    def __init__(self, base_url: str = None):
+        """
+        初始化MinerU处理类，从环境变量读取配置
+        """
+        super().__init__(base_url)
+        
+        # 复用TCP/TLS连接：所有同步请求共用一个带连接池的Session
+        # 鉴权头仍按请求传入，避免发往OSS/结果下载地址时携带API Token
+        # 连接异常及5xx/429由urllib3在传输层退避重试；POST非幂等，仅在连接未建立时重试，避免重复创建批量任务
+        self.session = requests.Session()
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # 回调等待：batch_id -> 收到该批次回调时置位的事件（由notify_callback唤醒）
+        self._result_waiters: Dict[str, threading.Event] = {}
+        self._waiters_lock = threading.Lock()
 
     def _handle_response(self, response: requests.Response) -> Dict:
         """统一处理API响应"""
-        if response.status_code != 200:
-            raise Exception(f"API请求失败，状态码: {response.status_code}, 响应: {response.text}")
-        
-        result = response.json()
-        if result.get('code') != 0:
-            error_msg = result.get('msg', '未知错误')
-            trace_id = result.get('trace_id', '')
-            error_code = result.get('code', '')
-            raise Exception(f"业务错误 [{error_code}]: {error_msg}, trace_id: {trace_id}")
-        return result['data']
+        return _unwrap_result(response.status_code, response.content)
 
     def upload_files(
         self,
@@ -55,75 +608,119 @@ class MinerUProcessor:
         callback: Optional[str] = None,
         seed: Optional[str] = None,
         extra_formats: Optional[List[str]] = None,
-        model_version: str = "v2"
-    ) -> str:
+        model_version: str = "v2",
+        group_size: int = MAX_BATCH_SIZE,
+        dedupe: bool = False
+    ) -> List[str]:
         """
-        批量上传文件并提交解析任务
+        批量上传文件并提交解析任务（文件以asyncio并发上传；在已运行事件循环的环境中调用时，上传在工作线程中进行）
+        文件按group_size分组，每组单独申请上传URL并生成一个批量任务；
+        上传当前组文件的同时申请下一组的URL，使申请URL的耗时被上传耗时掩盖
         :param file_paths: 本地文件路径列表
         :param is_ocr_list: 是否启用OCR的布尔值列表（与文件一一对应）
         :param data_ids: 自定义数据ID列表（与文件一一对应）
-        :return: 批量任务ID (batch_id)
+        :param group_size: 每组文件数（1~200），文件数不超过该值时只生成一个批量任务
+        :param dedupe: 内容及解析参数都相同的文件只上传解析一次，由同一实例的get_batch_results将结果回填给重复文件；
+                       被去掉的文件不会提交到服务端，其data_id不会出现在服务端记录中，也不会单独触发回调
+        :return: 各组的批量任务ID列表（与分组顺序一致）
+        :raises BatchSubmitError: 部分分组申请上传URL失败时抛出，其余分组照常上传，已创建的batch_id见异常的batch_ids属性
         """
-        # 验证文件数量
-        if len(file_paths) > 200:
-            raise ValueError("单次上传文件数量不能超过200个")
+        payload = _build_payload(
+            [], enable_formula, enable_table, language,
+            callback, seed, extra_formats, model_version
+        )
+        # 先校验全部文件再发起网络请求；文件大小在进入事件循环前取得，协程内不做阻塞的系统调用
+        plan = self._prepare_upload(file_paths, is_ocr_list, data_ids, page_ranges, payload, group_size, dedupe)
         
-        # 构建files参数
-        files_data = []
-        for i, path in enumerate(file_paths):
-            file_info = {
-                "name": os.path.basename(path),
-                "is_ocr": is_ocr_list[i] if is_ocr_list and i < len(is_ocr_list) else False
-            }
-            
-            # 添加可选参数
-            if data_ids and i < len(data_ids):
-                file_info["data_id"] = data_ids[i]
-            if page_ranges and i < len(page_ranges):
-                file_info["page_ranges"] = page_ranges[i]
-            
-            files_data.append(file_info)
-        
-        # 构建请求体
-        payload = {
-            "enable_formula": enable_formula,
-            "enable_table": enable_table,
-            "language": language,
-            "files": files_data,
-            "model_version": model_version
-        }
-        
-        # 添加可选全局参数
-        if callback:
-            payload["callback"] = callback
-        if seed:
-            payload["seed"] = seed
-        if extra_formats:
-            payload["extra_formats"] = extra_formats
+        batches, errors = self._run_async(self._upload_pipeline, plan.groups, plan.total_size)
+        return self._finish_upload(batches, errors, plan)
+
+    async def _upload_pipeline(
+        self,
+        groups: List[Tuple[List[str], List[int], Dict]],
+        total_size: int
+    ) -> Tuple[List[Tuple[Optional[str], List[bool]]], List[Optional[Exception]]]:
+        """
+        生产者在线程中逐组申请上传URL，消费者并发上传已拿到URL的组，二者通过容量为1的队列衔接
+        某组申请失败时记录异常并继续申请后续分组
+        :param total_size: 全部文件的总字节数，用于输出整体上传进度
+        :return: (每组的(batch_id, 各文件是否上传成功)，失败组为(None, []), 每组申请URL时的异常，成功组为None)
+        """
+        queue = asyncio.Queue(maxsize=1)
+        on_uploaded = _upload_progress_reporter(total_size)
+        errors: List[Optional[Exception]] = []
         
-        # 请求上传URL
-        url = f"{self.base_url}/file-urls/batch"
-        response = requests.post(url, headers=self.headers, json=payload)
-        data = self._handle_response(response)
+        async def produce():
+            try:
+                for group_paths, group_sizes, payload in groups:
+                    try:
+                        data = await asyncio.to_thread(self._request_upload_urls, payload)
+                        errors.append(None)
+                    except Exception as e:
+                        data = None
+                        errors.append(e)
+                    await queue.put((group_paths, group_sizes, data))
+            finally:
+                # 通知消费者结束
+                await queue.put(None)
         
-        # 上传文件到OSS
-        batch_id = data["batch_id"]
-        upload_urls = data["file_urls"]
+        producer = asyncio.create_task(produce())
+        sem = asyncio.Semaphore(self.upload_workers)
+        batches = []
         
-        success_count = 0
-        for i, (file_path, upload_url) in enumerate(zip(file_paths, upload_urls)):
+        async with aiohttp.ClientSession() as session:
             try:
-                with open(file_path, 'rb') as f:
-                    upload_response = requests.put(upload_url, data=f)
-                    if upload_response.status_code == 200:
-                        success_count += 1
-                    else:
-                        print(f"警告: 文件 {file_path} 上传失败 (状态码: {upload_response.status_code})")
-            except Exception as e:
-                print(f"文件 {file_path} 上传异常: {str(e)}")
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    group_paths, group_sizes, data = item
+                    if data is None:
+                        batches.append((None, []))
+                        continue
+                    results = await asyncio.gather(*[
+                        self._put_one(session, sem, file_path, file_size, upload_url, on_uploaded)
+                        for file_path, file_size, upload_url in zip(group_paths, group_sizes, data["file_urls"])
+                    ])
+                    if len(groups) > 1:
+                        print(f"第{len(batches) + 1}组上传完成: {sum(results)}/{len(group_paths)} 个文件, batch_id: {data['batch_id']}")
+                    batches.append((data["batch_id"], results))
+            except BaseException:
+                producer.cancel()
+                raise
         
-        print(f"批量上传完成! 成功上传 {success_count}/{len(file_paths)} 个文件, batch_id: {batch_id}")
-        return batch_id
+        await producer
+        return batches, errors
+
+    @staticmethod
+    def _run_async(coro_func: Callable, *args):
+        """
+        同步执行协程并返回结果
+        当前线程已有运行中的事件循环（如Jupyter）时无法使用asyncio.run，改为在工作线程的新事件循环中执行
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro_func(*args))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(lambda: asyncio.run(coro_func(*args))).result()
+
+    def _request_upload_urls(self, payload: Dict) -> Dict:
+        """申请文件上传URL，返回包含batch_id和file_urls的数据"""
+        url = f"{self.base_url}/file-urls/batch"
+        response = self._post_json(url, payload)
+        return self._handle_response(response)
+
+    def _post_json(self, url: str, payload: Dict) -> requests.Response:
+        """发送JSON请求；开启压缩且请求体较大时以gzip发送，服务端不支持(415)则改回明文重发"""
+        body = _json_dumps(payload)
+        if self.compress_requests and len(body) >= self.compress_min_size:
+            headers = {**self.headers, 'Content-Encoding': 'gzip'}
+            response = self.session.post(url, headers=headers, data=gzip.compress(body))
+            if response.status_code != 415:
+                return response
+            self.compress_requests = False
+        return self.session.post(url, headers=self.headers, data=body)
 
     def submit_urls(
         self,
@@ -138,124 +735,494 @@ class MinerUProcessor:
         seed: Optional[str] = None,
         extra_formats: Optional[List[str]] = None,
         model_version: str = "v2"
-    ) -> str:
+    ) -> List[str]:
         """
-        通过URL批量提交解析任务
+        通过URL批量提交解析任务，超过200个URL时自动分组并发提交
         :param urls: 文件URL列表
-        :return: 批量任务ID (batch_id)
+        :return: 各组的批量任务ID列表（与分组顺序一致）
+        :raises BatchSubmitError: 部分分组提交失败时抛出，已创建的batch_id见异常的batch_ids属性
         """
-        if len(urls) > 200:
-            raise ValueError("单次提交URL数量不能超过200个")
-        
         # 构建files参数
-        files_data = []
-        for i, url in enumerate(urls):
-            file_info = {"url": url}
-            
-            if is_ocr_list and i < len(is_ocr_list):
-                file_info["is_ocr"] = is_ocr_list[i]
-            if data_ids and i < len(data_ids):
-                file_info["data_id"] = data_ids[i]
-            if page_ranges and i < len(page_ranges):
-                file_info["page_ranges"] = page_ranges[i]
-            
-            files_data.append(file_info)
+        files_data = _zip_files_data("url", urls, is_ocr_list, data_ids, page_ranges)
         
         # 构建请求体
-        payload = {
-            "enable_formula": enable_formula,
-            "enable_table": enable_table,
-            "language": language,
-            "files": files_data,
-            "model_version": model_version
-        }
+        payload = _build_payload(
+            [], enable_formula, enable_table, language,
+            callback, seed, extra_formats, model_version
+        )
+        payloads = _split_payloads(payload, files_data)
+        
+        # 提交任务；空列表不发请求，返回空ID列表
+        if not payloads:
+            return []
+        
+        def submit(group_payload: Dict) -> Tuple[Optional[str], Optional[Exception]]:
+            # 单组失败不影响其他组，异常在全部提交后统一抛出
+            try:
+                return self._submit_url_batch(group_payload), None
+            except Exception as e:
+                return None, e
         
-        if callback:
-            payload["callback"] = callback
-        if seed:
-            payload["seed"] = seed
-        if extra_formats:
-            payload["extra_formats"] = extra_formats
+        if len(payloads) > 1:
+            with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+                outcomes = list(executor.map(submit, payloads))
+        else:
+            outcomes = [submit(payload) for payload in payloads]
         
-        # 提交任务
+        batch_ids = [batch_id for batch_id, _ in outcomes]
+        return self._finish_submit(batch_ids, [error for _, error in outcomes])
+
+    def _submit_url_batch(self, payload: Dict) -> str:
+        """提交一组URL解析任务，返回batch_id"""
         url = f"{self.base_url}/extract/task/batch"
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post_json(url, payload)
         data = self._handle_response(response)
-        
-        batch_id = data["batch_id"]
-        print(f"URL批量任务提交成功! batch_id: {batch_id}")
-        return batch_id
+        return data["batch_id"]
 
     def get_batch_results(
         self,
-        batch_id: str,
+        batch_id: Union[str, List[str]],
         max_retries: int = None,
-        interval: int = None
+        interval: int = None,
+        wait: str = "poll"
     ) -> List[Dict]:
         """
-        获取批量任务结果（支持轮询等待完成）
-        :param batch_id: 批量任务ID
-        :param max_retries: 最大轮询次数（默认使用类配置）
-        :param interval: 轮询间隔(秒)（默认使用类配置）
-        :return: 任务结果列表
+        获取批量任务结果（支持等待完成）
+        wait="poll"：定时轮询，轮询间隔采用带随机抖动的指数退避，进度推进时回到基础间隔，无进展时逐步加倍（最多2^5倍）
+        wait="callback"：上传/提交时指定了callback且回调请求由CallbackServer转交时使用，
+                         收到该批次回调才查询一次状态，不再定时轮询；轮询仅作为没有回调地址时的后备方式
+        :param batch_id: 批量任务ID，或upload_files/submit_urls返回的ID列表（各批次并行等待）
+        :param max_retries: 最大轮询次数（默认使用类配置），与interval共同决定最长等待时间 max_retries*interval 秒
+        :param interval: 基础轮询间隔(秒)（默认使用类配置）
+        :param wait: 等待方式，"poll"或"callback"
+        :return: 任务结果列表（多个批次时按批次顺序合并）
         """
-        url = f"{self.base_url}/extract-results/batch/{batch_id}"
+        if wait not in ("poll", "callback"):
+            raise ValueError(f"不支持的等待方式: {wait}，可选 poll / callback")
         
         max_retries = max_retries or self.max_retries
         interval = interval or self.retry_interval
         
-        for attempt in range(max_retries):
-            response = requests.get(url, headers=self.headers)
-            data = self._handle_response(response)
+        def wait_one(single_id: str) -> List[Dict]:
+            tasks = self._wait_batch(single_id, max_retries, interval, wait)
+            return self._expand_duplicates(single_id, tasks)
+        
+        if isinstance(batch_id, str):
+            return wait_one(batch_id)
+        # 空文件列表上传/提交时返回空ID列表
+        if not batch_id:
+            return []
+        if len(batch_id) == 1:
+            return wait_one(batch_id[0])
+        
+        with ThreadPoolExecutor(max_workers=len(batch_id)) as executor:
+            return [task for tasks in executor.map(wait_one, batch_id) for task in tasks]
+
+    def notify_callback(self, content: Dict) -> None:
+        """
+        回调服务收到MinerU的结果通知后调用，唤醒等待对应批次的get_batch_results
+        通知内容不含batch_id时无法判断所属批次，唤醒全部等待者各自查询一次
+        """
+        batch_id = content.get('batch_id')
+        with self._waiters_lock:
+            if batch_id in self._result_waiters:
+                events = [self._result_waiters[batch_id]]
+            else:
+                events = list(self._result_waiters.values())
+        for event in events:
+            event.set()
+
+    def _wait_batch(self, batch_id: str, max_retries: int, interval: int, wait: str) -> List[Dict]:
+        """等待单个批量任务直到全部结束或超时"""
+        url = f"{self.base_url}/extract-results/batch/{batch_id}"
+        
+        # 以总等待时间作为超时预算，不受退避后轮询次数变化的影响
+        budget = max_retries * interval
+        if wait == "callback":
+            return self._wait_batch_callback(batch_id, url, budget)
+        
+        schedule = _PollSchedule(interval, budget)
+        while True:
+            data = self._poll_batch(batch_id, url)
             
             # 检查所有任务是否完成
-            all_done = True
-            for task in data['extract_result']:
-                if task['state'] not in ['done', 'failed']:
-                    all_done = False
-                    break
-            
-            if all_done:
+            if _all_finished(data['extract_result']):
+                self._forget_batch(batch_id)
                 return data['extract_result']
             
-            # 显示进度信息
-            progress_info = []
-            for task in data['extract_result']:
-                if task['state'] == 'running' and 'extract_progress' in task:
-                    progress = task['extract_progress']
-                    progress_info.append(
-                        f"{task['file_name']}: {progress['extracted_pages']}/{progress['total_pages']}页"
-                    )
-            
-            status = ", ".join(progress_info) if progress_info else "等待中"
-            print(f"[{attempt+1}/{max_retries}] 任务进行中: {status}... {interval}秒后重试")
-            time.sleep(interval)
+            delay = schedule.next_delay(data['extract_result'])
+            if delay is None:
+                raise schedule.timeout_error()
+            time.sleep(delay)
+
+    def _wait_batch_callback(self, batch_id: str, url: str, budget: float) -> List[Dict]:
+        """登记等待事件，每收到一次该批次的回调查询一次状态，直到全部结束或超时"""
+        event = threading.Event()
+        with self._waiters_lock:
+            self._result_waiters[batch_id] = event
+        
+        deadline = time.monotonic() + budget
+        try:
+            while True:
+                # 先清除再查询：查询期间到达的回调会使下面的wait立即返回
+                event.clear()
+                data = self._poll_batch(batch_id, url)
+                if _all_finished(data['extract_result']):
+                    self._forget_batch(batch_id)
+                    return data['extract_result']
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not event.wait(remaining):
+                    break
+        finally:
+            with self._waiters_lock:
+                self._result_waiters.pop(batch_id, None)
         
-        raise TimeoutError(f"获取结果超时（{max_retries}次尝试），请稍后手动查询")
+        raise TimeoutError(f"获取结果超时（已等待{budget}秒未收到完成回调），请稍后手动查询")
+
+    def _poll_batch(self, batch_id: str, url: str) -> Dict:
+        """
+        查询一次批量任务状态，携带If-None-Match发送条件请求
+        结果未变化时服务端返回304，直接复用上次解析的数据
+        """
+        headers = self._poll_headers
+        etag = self._last_etag.get(batch_id)
+        if etag:
+            headers = {**self._poll_headers, 'If-None-Match': etag}
+        
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and batch_id in self._last_data:
+            return self._last_data[batch_id]
+        
+        data = self._handle_response(response)
+        etag = response.headers.get('ETag')
+        if etag:
+            self._last_etag[batch_id] = etag
+            self._last_data[batch_id] = data
+        return data
 
     def download_result(self, zip_url: str, save_path: str) -> None:
         """
         下载解析结果压缩包
+        先发起普通GET，根据响应头判断：服务端支持Range且文件较大时关闭该响应改为分段并发下载，否则直接顺序流式下载
         :param zip_url: 结果压缩包URL
         :param save_path: 本地保存路径
         """
-        response = requests.get(zip_url, stream=True)
-        if response.status_code != 200:
-            raise Exception(f"下载失败: HTTP {response.status_code}")
+        response = self._open_download(zip_url)
         
         # 确保目录存在
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         
+        total_size = int(response.headers.get('Content-Length', 0))
+        if (response.headers.get('Accept-Ranges') == 'bytes' and total_size >= self.download_min_range_size
+                and self.download_workers > 1 and hasattr(os, 'pwrite')):
+            response.close()
+            try:
+                self._download_ranges(zip_url, save_path, total_size)
+            except Exception as e:
+                # 分段下载失败（如服务端实际忽略Range、分段不完整）时，删除预分配的残缺文件并改为顺序下载
+                print(f"分段下载失败，改为顺序下载: {str(e)}")
+                if os.path.exists(save_path):
+                    os.remove(save_path)
+                self._save_stream(self._open_download(zip_url), save_path)
+        else:
+            self._save_stream(response, save_path)
+        
+        print(f"\n结果已保存至: {save_path}")
+
+    def _open_download(self, zip_url: str) -> requests.Response:
+        """发起流式GET请求，只读取响应头"""
+        response = self.session.get(zip_url, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise Exception(f"下载失败: HTTP {response.status_code}")
+        return response
+
+    def _download_ranges(self, zip_url: str, save_path: str, total_size: int) -> None:
+        """将文件按字节区间切分，多线程并发发送Range请求，各自用pwrite写入预分配文件的对应位置"""
+        part_size = -(-total_size // self.download_workers)
+        parts = [
+            (start, min(start + part_size, total_size) - 1)
+            for start in range(0, total_size, part_size)
+        ]
+        
+        fd = os.open(save_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, total_size)
+            with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+                # list()使任一分段的异常在此处抛出
+                list(executor.map(lambda part: self._download_part(zip_url, fd, *part), parts))
+        finally:
+            os.close(fd)
+
+    def _download_part(self, zip_url: str, fd: int, start: int, end: int) -> None:
+        """下载[start, end]字节区间并写入文件"""
+        response = self.session.get(zip_url, headers={'Range': f'bytes={start}-{end}'}, stream=True)
+        if response.status_code != 206:
+            raise Exception(f"分段下载失败: HTTP {response.status_code}")
+        
+        offset = start
+        for chunk in response.iter_content(chunk_size=self.download_chunk_size):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+        if offset != end + 1:
+            raise Exception(f"分段下载不完整: 字节 {start}-{end}")
+
+    def _save_stream(self, response: requests.Response, save_path: str) -> None:
+        """将已打开的响应单连接顺序写入文件"""
         total_size = int(response.headers.get('content-length', 0))
+        
+        # 未连接终端（如输出重定向到日志）时不显示进度，由shutil.copyfileobj按大块直接拷贝
+        if total_size <= 0 or not sys.stdout.isatty():
+            response.raw.decode_content = True
+            with open(save_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=self.download_chunk_size)
+            return
+        
         downloaded = 0
+        last_percent = -1
         
         with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=self.download_chunk_size):
                 if chunk:
                     f.write(chunk)
                     downloaded += len(chunk)
+                    # 进度每跨过一个整百分点才输出一次
+                    percent = downloaded * 100 // total_size
+                    if percent != last_percent:
+                        last_percent = percent
+                        print(f"\r下载进度: {percent}% ({downloaded}/{total_size}字节)", end='')
+
+
+class AsyncMinerUProcessor(_MinerUBase):
+    """
+    MinerUProcessor的异步版本，供已在事件循环中运行的应用（如FastAPI）直接await调用
+    所有请求共用一个aiohttp.ClientSession，用完需调用close()，或使用 async with AsyncMinerUProcessor() as processor
+    """
+    def __init__(self, base_url: str = None):
+        """
+        初始化异步MinerU处理类，从环境变量读取配置
+        """
+        super().__init__(base_url)
+        
+        # 会话在首次请求时于当前事件循环内创建
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncMinerUProcessor":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+            )
+        return self._session
+
+    async def _post_json(self, url: str, payload: Dict) -> Dict:
+        """发送JSON请求并返回data字段；压缩规则与MinerUProcessor._post_json相同，服务端不支持(415)则改回明文重发"""
+        body = _json_dumps(payload)
+        session = self._get_session()
+        if self.compress_requests and len(body) >= self.compress_min_size:
+            headers = {**self.headers, 'Content-Encoding': 'gzip'}
+            async with session.post(url, headers=headers, data=gzip.compress(body)) as response:
+                if response.status != 415:
+                    return _unwrap_result(response.status, await response.read())
+            self.compress_requests = False
+        async with session.post(url, headers=self.headers, data=body) as response:
+            return _unwrap_result(response.status, await response.read())
+
+    async def upload_files(
+        self,
+        file_paths: List[str],
+        is_ocr_list: Optional[List[bool]] = None,
+        data_ids: Optional[List[str]] = None,
+        enable_formula: bool = True,
+        enable_table: bool = True,
+        language: str = "ch",
+        page_ranges: Optional[List[str]] = None,
+        callback: Optional[str] = None,
+        seed: Optional[str] = None,
+        extra_formats: Optional[List[str]] = None,
+        model_version: str = "v2",
+        group_size: int = MAX_BATCH_SIZE,
+        dedupe: bool = False
+    ) -> List[str]:
+        """
+        批量上传文件并提交解析任务，参数与MinerUProcessor.upload_files相同
+        各组的URL申请与文件上传并发进行，同时进行的上传数不超过upload_workers
+        :return: 各组的批量任务ID列表（与分组顺序一致）
+        :raises BatchSubmitError: 部分分组申请上传URL失败时抛出，已创建的batch_id见异常的batch_ids属性
+        """
+        payload = _build_payload(
+            [], enable_formula, enable_table, language,
+            callback, seed, extra_formats, model_version
+        )
+        # 读取文件大小及去重哈希在线程中进行
+        plan = await asyncio.to_thread(
+            self._prepare_upload, file_paths, is_ocr_list, data_ids, page_ranges, payload, group_size, dedupe
+        )
+        sem = asyncio.Semaphore(self.upload_workers)
+        on_uploaded = _upload_progress_reporter(plan.total_size)
+        
+        results = await asyncio.gather(*[
+            self._upload_group(sem, group_paths, group_sizes, group_payload, on_uploaded)
+            for group_paths, group_sizes, group_payload in plan.groups
+        ], return_exceptions=True)
+        
+        batches, errors = _split_gathered(results)
+        batches = [batch or (None, []) for batch in batches]
+        return self._finish_upload(batches, errors, plan)
+
+    async def _upload_group(
+        self,
+        sem: asyncio.Semaphore,
+        file_paths: List[str],
+        file_sizes: List[int],
+        payload: Dict,
+        on_uploaded: Callable[[int], None]
+    ) -> Tuple[str, List[bool]]:
+        """申请一组文件的上传URL并并发上传，返回(batch_id, 各文件是否上传成功)"""
+        data = await self._post_json(f"{self.base_url}/file-urls/batch", payload)
+        session = self._get_session()
+        results = await asyncio.gather(*[
+            self._put_one(session, sem, file_path, file_size, upload_url, on_uploaded)
+            for file_path, file_size, upload_url in zip(file_paths, file_sizes, data["file_urls"])
+        ])
+        return data["batch_id"], results
+
+    async def submit_urls(
+        self,
+        urls: List[str],
+        is_ocr_list: Optional[List[bool]] = None,
+        data_ids: Optional[List[str]] = None,
+        enable_formula: bool = True,
+        enable_table: bool = True,
+        language: str = "ch",
+        page_ranges: Optional[List[str]] = None,
+        callback: Optional[str] = None,
+        seed: Optional[str] = None,
+        extra_formats: Optional[List[str]] = None,
+        model_version: str = "v2"
+    ) -> List[str]:
+        """
+        通过URL批量提交解析任务，超过200个URL时自动分组并发提交
+        :return: 各组的批量任务ID列表（与分组顺序一致）
+        :raises BatchSubmitError: 部分分组提交失败时抛出，已创建的batch_id见异常的batch_ids属性
+        """
+        files_data = _zip_files_data("url", urls, is_ocr_list, data_ids, page_ranges)
+        payload = _build_payload(
+            [], enable_formula, enable_table, language,
+            callback, seed, extra_formats, model_version
+        )
+        
+        # 空列表不发请求，返回空ID列表
+        payloads = _split_payloads(payload, files_data)
+        if not payloads:
+            return []
+        
+        url = f"{self.base_url}/extract/task/batch"
+        results = await asyncio.gather(*[
+            self._post_json(url, group_payload) for group_payload in payloads
+        ], return_exceptions=True)
+        
+        results, errors = _split_gathered(results)
+        batch_ids = [data["batch_id"] if data is not None else None for data in results]
+        return self._finish_submit(batch_ids, errors)
+
+    async def get_batch_results(
+        self,
+        batch_id: Union[str, List[str]],
+        max_retries: int = None,
+        interval: int = None
+    ) -> List[Dict]:
+        """
+        轮询获取批量任务结果，退避策略与MinerUProcessor.get_batch_results相同
+        :param batch_id: 批量任务ID，或ID列表（各批次并发轮询）
+        :return: 任务结果列表（多个批次时按批次顺序合并）
+        """
+        max_retries = max_retries or self.max_retries
+        interval = interval or self.retry_interval
+        
+        async def wait_one(single_id: str) -> List[Dict]:
+            tasks = await self._wait_batch(single_id, max_retries, interval)
+            return self._expand_duplicates(single_id, tasks)
+        
+        if isinstance(batch_id, str):
+            return await wait_one(batch_id)
+        
+        batch_results = await asyncio.gather(*[wait_one(single_id) for single_id in batch_id])
+        return [task for tasks in batch_results for task in tasks]
+
+    async def _wait_batch(self, batch_id: str, max_retries: int, interval: int) -> List[Dict]:
+        """轮询单个批量任务直到全部结束或超时"""
+        url = f"{self.base_url}/extract-results/batch/{batch_id}"
+        
+        schedule = _PollSchedule(interval, max_retries * interval)
+        while True:
+            data = await self._poll_batch(batch_id, url)
+            
+            if _all_finished(data['extract_result']):
+                self._forget_batch(batch_id)
+                return data['extract_result']
+            
+            delay = schedule.next_delay(data['extract_result'])
+            if delay is None:
+                raise schedule.timeout_error()
+            await asyncio.sleep(delay)
+
+    async def _poll_batch(self, batch_id: str, url: str) -> Dict:
+        """查询一次批量任务状态，携带If-None-Match，结果未变化(304)时复用上次数据"""
+        headers = self._poll_headers
+        etag = self._last_etag.get(batch_id)
+        if etag:
+            headers = {**self._poll_headers, 'If-None-Match': etag}
+        
+        async with self._get_session().get(url, headers=headers) as response:
+            if response.status == 304 and batch_id in self._last_data:
+                return self._last_data[batch_id]
+            
+            data = _unwrap_result(response.status, await response.read())
+            etag = response.headers.get('ETag')
+        if etag:
+            self._last_etag[batch_id] = etag
+            self._last_data[batch_id] = data
+        return data
+
+    async def download_result(self, zip_url: str, save_path: str) -> None:
+        """
+        下载解析结果压缩包（流式读取，写盘在线程中进行）
+        :param zip_url: 结果压缩包URL
+        :param save_path: 本地保存路径
+        """
+        async with self._get_session().get(zip_url) as response:
+            if response.status != 200:
+                raise Exception(f"下载失败: HTTP {response.status}")
+            
+            # 确保目录存在
+            await asyncio.to_thread(os.makedirs, os.path.dirname(save_path), exist_ok=True)
+            
+            total_size = response.content_length or 0
+            downloaded = 0
+            last_percent = -1
+            
+            async with aiofiles.open(save_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                    await f.write(chunk)
+                    downloaded += len(chunk)
+                    # 进度每跨过一个整百分点才输出一次
                     if total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        print(f"$\r$下载进度: {progress:.1f}% ({downloaded}/{total_size}字节)", end='')
+                        percent = downloaded * 100 // total_size
+                        if percent != last_percent:
+                            last_percent = percent
+                            print(f"\r下载进度: {percent}% ({downloaded}/{total_size}字节)", end='')
         
-        print(f"$\n$结果已保存至: {save_path}")
\ No newline at end of file
+        print(f"\n结果已保存至: {save_path}")